@@ -1,8 +1,9 @@
 from dotenv import load_dotenv
 load_dotenv()
+import logging
 import pandas as pd
 import io
-from source_code.graph import ds_machine
+from source_code.graph import get_ds_machine
 
 def run_pipeline():
     file_path = "data\\telecom_churn_data.csv"  # Replace with your actual file path
@@ -50,7 +51,7 @@ def run_pipeline():
 
     print("\n2. Starting the DS Machine...\n")
 
-    for output in ds_machine.stream(initial_input):
+    for output in get_ds_machine().stream(initial_input):
         for node_name, state_updates in output.items():
             if "cleaning_code" in state_updates:
                 print(f"--- CODE GENERATED BY {node_name.upper()} ---")
@@ -66,4 +67,6 @@ def run_pipeline():
                         print(f"    reason: {field.get('reason')}\n")
 
 if __name__ == "__main__":
+    # INFO keeps the agent's progress visible; use DEBUG to also dump the raw LLM response
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     run_pipeline()
\ No newline at end of file
@@ -1,58 +1,107 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import logging
 import os
 import re
+import sqlite3
+import weakref
+from langchain_core.exceptions import OutputParserException
 from langchain_groq import ChatGroq
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from source_code.state import AgentState
+from source_code.trie import Trie
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+#  OUTPUT SCHEMA: Returned by the LLM as structured output
+# ─────────────────────────────────────────────
+
+class AmbiguousField(BaseModel):
+    original_column: str
+    candidates: list[str] = Field(default_factory=list)
+    reason: str = ""
+    sample_values: str = Field(default="", description="actual values from data")
+
+    # Free-form review notes are coerced rather than rejected: one odd value
+    # (e.g. an int date sample) must not void the whole rename map
+    @field_validator("candidates", mode="before")
+    @classmethod
+    def _as_str_list(cls, value):
+        if value is None:
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return [str(item) for item in value]
+
+    @field_validator("reason", "sample_values", mode="before")
+    @classmethod
+    def _as_str(cls, value):
+        return "" if value is None else str(value)
+
+class FieldStandardizationOutput(BaseModel):
+    rename_map: dict[str, str] = Field(description="raw column name → new column name, for every column")
+    ambiguous_fields: list[AmbiguousField] = Field(default_factory=list)
 
 # ─────────────────────────────────────────────
 #  TELECOM DOMAIN KNOWLEDGE BASES
 # ─────────────────────────────────────────────
 
-TELECOM_ABBREVIATION_MAP = """
-Known Telecom Abbreviations & Their Meanings:
-- aon         → AgeOnNetwork
-- mou         → MinutesOfUse
-- arpu        → AvgRevenuePerUser
-- rev         → Revenue
-- cnt         → Count
-- amt         → Amount
-- vol         → Volume
-- avg         → Avg
-- msisdn      → Msisdn (treat as ID)
-- imsi        → Imsi (treat as ID)
-- cust        → Customer
-- acct        → Account
-- seg         → Segment
-- flg / flag  → Flag
-- ind         → Flag (binary indicator)
-- dt          → Date
-- mnth / mth  → Month
-- wk          → Week
-- l30d        → Last30d
-- l60d        → Last60d
-- l90d        → Last90d
-- p30d        → Prev30d
-- rchg        → Recharge
-- tot / ttl   → Total
-- outg        → Outgoing
-- inc / incmg → Incoming
-- intl        → Intl
-- roam        → Roaming
-- vas         → Vas
-- gprs        → Data
-- offnet      → Offnet
-- onnet       → Onnet
-- clv / ltv   → Ltv
-- comp        → Complaint
-- cc          → CustCare
-- gndr        → Gender
-- rgn         → Region
-- actv        → Activation
-- deactv      → Deactivation
-- dob         → BirthDate
-- hva         → HighValue
-- mva         → MidValue
-- lva         → LowValue
-"""
+# (aliases, expansion, note) — rendered into the prompt and indexed for local lookups
+_ABBREV_ENTRIES = (
+    (("aon",),              "AgeOnNetwork",        None),
+    (("mou",),              "MinutesOfUse",        None),
+    (("arpu",),             "AvgRevenuePerUser",   None),
+    (("rev",),              "Revenue",             None),
+    (("cnt",),              "Count",               None),
+    (("amt",),              "Amount",              None),
+    (("vol",),              "Volume",              None),
+    (("avg",),              "Avg",                 None),
+    (("msisdn",),           "Msisdn",              "treat as ID"),
+    (("imsi",),             "Imsi",                "treat as ID"),
+    (("cust",),             "Customer",            None),
+    (("acct",),             "Account",             None),
+    (("seg",),              "Segment",             None),
+    (("flg", "flag"),       "Flag",                None),
+    (("ind",),              "Flag",                "binary indicator"),
+    (("dt",),               "Date",                None),
+    (("mnth", "mth"),       "Month",               None),
+    (("wk",),               "Week",                None),
+    (("l30d",),             "Last30d",             None),
+    (("l60d",),             "Last60d",             None),
+    (("l90d",),             "Last90d",             None),
+    (("p30d",),             "Prev30d",             None),
+    (("rchg",),             "Recharge",            None),
+    (("tot", "ttl"),        "Total",               None),
+    (("outg",),             "Outgoing",            None),
+    (("inc", "incmg"),      "Incoming",            None),
+    (("intl",),             "Intl",                None),
+    (("roam",),             "Roaming",             None),
+    (("vas",),              "Vas",                 None),
+    (("gprs",),             "Data",                None),
+    (("offnet",),           "Offnet",              None),
+    (("onnet",),            "Onnet",               None),
+    (("clv", "ltv"),        "Ltv",                 None),
+    (("comp",),             "Complaint",           None),
+    (("cc",),               "CustCare",            None),
+    (("gndr",),             "Gender",              None),
+    (("rgn",),              "Region",              None),
+    (("actv",),             "Activation",          None),
+    (("deactv",),           "Deactivation",        None),
+    (("dob",),              "BirthDate",           None),
+    (("hva",),              "HighValue",           None),
+    (("mva",),              "MidValue",            None),
+    (("lva",),              "LowValue",            None),
+)
+
+_ABBREV = {alias: expansion for aliases, expansion, _ in _ABBREV_ENTRIES for alias in aliases}
+
+TELECOM_ABBREVIATION_MAP = "\nKnown Telecom Abbreviations & Their Meanings:\n" + "\n".join(
+    f"- {' / '.join(aliases):<12}→ {expansion}" + (f" ({note})" if note else "")
+    for aliases, expansion, note in _ABBREV_ENTRIES
+) + "\n"
 
 TELECOM_DATA_UNIT_RULES = """
 Data Unit Detection Rules:
@@ -81,69 +130,40 @@ Date Field Detection Rules:
 - Do NOT convert — renaming only.
 """
 
-STANDARD_CHURN_SCHEMA = """
-Standard Churn Model Target Schema — use these names where a match exists:
-IDENTIFIERS:  CustomerId, Msisdn, AccountId
-DEMOGRAPHICS: AgeYears, Gender, Region, City, Nationality, MaritalStatus, Segment
-TENURE:       TenureMonths, TenureDays, ActivationDate, DeactivationDate, ContractType
-REVENUE:      ArpuMonthly, RevenueLast30d, RevenueLast60d, RevenueLast90d, TotalRevenue
-VOICE:        MouOutgoingLast30dMins, MouIncomingLast30dMins, MouOffnetLast30dMins,
-              MouOnnetLast30dMins, MouIntlLast30dMins
-DATA:         DataUsageLast30dKb, DataUsageLast60dKb, DataRechargeCountLast30d
-SMS:          SmsOutgoingLast30d, SmsIncomingLast30d
-RECHARGES:    RechargeAmountLast30d, RechargeCountLast30d, DaysSinceLastRecharge
-VAS:          VasSubCount, VasRevenueLast30d
-COMPLAINTS:   ComplaintCountLast90d, DaysSinceLastComplaint, CustCareCallsLast30d
-PRODUCT:      ProductCount, HandsetAgeMonths, DataPlanFlag, RoamingFlag
-TARGET:       ChurnFlag (1=churned, 0=active)
-"""
-
-# ─────────────────────────────────────────────
-#  PRE-PROCESSING: Strip SQL aliases
-# ─────────────────────────────────────────────
-
-def preprocess_column_names(columns: list) -> dict:
-    cleaned = {}
-    for col in columns:
-        c = col.strip()
-        c = re.sub(r'^[a-zA-Z]\.', '', c)
-        c = re.sub(r'^[a-zA-Z_]+\.', '', c)
-        c = c.strip().lower()
-        cleaned[col] = c
-    return cleaned
+# Canonical target names by group — the single source for the prompt block and
+# for _STANDARD_NAMES, which decides what the local pre-pass may rename
+_STANDARD_SCHEMA = (
+    ("IDENTIFIERS",  ("CustomerId", "Msisdn", "AccountId")),
+    ("DEMOGRAPHICS", ("AgeYears", "Gender", "Region", "City", "Nationality", "MaritalStatus", "Segment")),
+    ("TENURE",       ("TenureMonths", "TenureDays", "ActivationDate", "DeactivationDate", "ContractType")),
+    ("REVENUE",      ("ArpuMonthly", "RevenueLast30d", "RevenueLast60d", "RevenueLast90d", "TotalRevenue")),
+    ("VOICE",        ("MouOutgoingLast30dMins", "MouIncomingLast30dMins", "MouOffnetLast30dMins",
+                      "MouOnnetLast30dMins", "MouIntlLast30dMins")),
+    ("DATA",         ("DataUsageLast30dKb", "DataUsageLast60dKb", "DataRechargeCountLast30d")),
+    ("SMS",          ("SmsOutgoingLast30d", "SmsIncomingLast30d")),
+    ("RECHARGES",    ("RechargeAmountLast30d", "RechargeCountLast30d", "DaysSinceLastRecharge")),
+    ("VAS",          ("VasSubCount", "VasRevenueLast30d")),
+    ("COMPLAINTS",   ("ComplaintCountLast90d", "DaysSinceLastComplaint", "CustCareCallsLast30d")),
+    ("PRODUCT",      ("ProductCount", "HandsetAgeMonths", "DataPlanFlag", "RoamingFlag")),
+    ("TARGET",       ("ChurnFlag",)),
+)
+
+_SCHEMA_NOTES = {"ChurnFlag": "1=churned, 0=active"}
+
+_STANDARD_NAMES = frozenset(name for _, names in _STANDARD_SCHEMA for name in names)
+
+STANDARD_CHURN_SCHEMA = "\nStandard Churn Model Target Schema — use these names where a match exists:\n" + "\n".join(
+    f"{group + ':':<14}" + ", ".join(
+        f"{name} ({_SCHEMA_NOTES[name]})" if name in _SCHEMA_NOTES else name for name in names
+    )
+    for group, names in _STANDARD_SCHEMA
+) + "\n"
 
 # ─────────────────────────────────────────────
-#  AGENT
+#  PROMPT: Static instructions (built once at import)
 # ─────────────────────────────────────────────
 
-def field_standardization_agent(state: AgentState) -> dict:
-    print("\n" + "="*60)
-    print("[Agent 1] Field Standardization — Starting")
-    print("="*60)
-
-    raw_columns  = state.get('df_columns', [])
-    pre_cleaned  = preprocess_column_names(raw_columns)
-    cleaned_cols = list(pre_cleaned.values())
-
-    if cleaned_cols:
-        print(f"[Agent 1] Pre-processed {len(raw_columns)} columns. SQL aliases stripped.")
-
-    llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0,
-        api_key=os.getenv("GROQ_API_KEY"),
-        max_tokens=8000
-    )
-
-    prompt = f"""You are a Telecom Data Engineering Agent. Rename DataFrame columns to a clean, standardized format.
-
-## INPUTS
-SQL QUERY: {state.get('sql_query', 'Not provided')}
-COLUMNS (aliases stripped): {cleaned_cols if cleaned_cols else 'see dataset profile'}
-DATASET PROFILE: {state.get('metadata_summary', 'Not provided')}
-SPECIAL RULES: {state.get('special_rules', 'None')}
-
-## NAMING RULES
+_PROMPT_BODY = f"""## NAMING RULES
 1. Use UpperCamelCase (PascalCase). Example: revenueLastMonth → RevenueLast30d
 2. Use SHORT but READABLE abbreviations — a non-telecom junior data scientist must understand them.
    GOOD: MouMins, ArpuMonthly, DataUsageKb, ChurnFlag, TenureDays
@@ -171,97 +191,355 @@ SPECIAL RULES: {state.get('special_rules', 'None')}
 - UNKNOWN: no reasonable interpretation → prefix new name with unknown_
 
 ## OUTPUT FORMAT
-Return EXACTLY two code blocks, nothing else.
-
-```python
-rename_map = {{
-    "raw_col": "CleanName",
-    "raw_col2": "ambiguous_raw_col2",
-    "raw_col3": "unknown_raw_col3"
-}}
-df = df.rename(columns=rename_map)
-```
-
-```python
-ambiguous_fields = [
-    {{
-        "original_column": "raw_col2",
-        "candidates": ["OptionA", "OptionB"],
-        "reason": "brief reason",
-        "sample_values": "actual values from data"
-    }}
-]
-```
+Fill both output fields:
+- rename_map: {{"raw_col": "CleanName", "raw_col2": "ambiguous_raw_col2", "raw_col3": "unknown_raw_col3"}}
+- ambiguous_fields: one entry per ambiguous_ column with original_column, candidates, reason, sample_values
 
 RULES:
-- No comments, no prose, no extra text outside the two blocks
 - Keys must exactly match raw column names
 - No duplicate values in rename_map
 - Never drop columns
 """
 
-    print("[Agent 1] Sending to LLM...")
-    response     = llm.invoke(prompt)
-
-    print("\n--- RAW LLM RESPONSE ---")
-    print(response.content)
-    print("------------------------\n")
-
-    raw_response = response.content
-
-    # ── Parse code blocks ──
-    code_blocks = re.findall(r'```(?:python)?(.*?)```', raw_response, re.DOTALL)
-    code_blocks = [block.strip() for block in code_blocks if block.strip()]
-
-    if not code_blocks:
-        print("[Agent 1] ERROR: LLM returned no parseable code blocks.")
-        return {**state, "cleaning_code": "", "ambiguous_fields": [], "column_map": {}}
-
-    rename_code    = code_blocks[0] if len(code_blocks) >= 1 else ""
-    ambiguous_code = code_blocks[1] if len(code_blocks) >= 2 else ""
-
-    # ── Safely extract ambiguous_fields ──
-    ambiguous_fields = []
-    if ambiguous_code:
-        try:
-            local_ns = {}
-            exec(ambiguous_code, {}, local_ns)
-            ambiguous_fields = local_ns.get("ambiguous_fields", [])
-        except Exception as e:
-            print(f"[Agent 1] WARNING: Could not parse ambiguous_fields: {e}")
-
-    # ── Safely extract rename_map for audit trail ──
-    column_map = {}
-    if rename_code:
-        try:
-            map_code = rename_code.split("df = df.rename")[0]
-            local_ns = {}
-            exec(map_code, {}, local_ns)
-            column_map = local_ns.get("rename_map", {})
-        except Exception as e:
-            print(f"[Agent 1] WARNING: Could not parse rename_map for audit: {e}")
+# ─────────────────────────────────────────────
+#  PRE-PROCESSING: Strip SQL aliases
+# ─────────────────────────────────────────────
+
+def _strip_sql_alias(col: str) -> str:
+    c = col.strip()
+    if '.' in c:
+        # Only qualifiers like t1.col / schema.tbl.col; decimal-style names such as rev_1.5 stay whole
+        parts = c.split('.')
+        if all(part.isidentifier() for part in parts):
+            return parts[-1].lower()
+    return c.lower()
+
+def preprocess_column_names(columns: list) -> list:
+    return [_strip_sql_alias(col) for col in columns]
+
+# ─────────────────────────────────────────────
+#  PRE-MAPPING: Resolve known abbreviations locally
+# ─────────────────────────────────────────────
+
+# Later sources win: abbreviation expansions over schema words (cust → Customer),
+# then the industry-standard terms naming rule 3 keeps unexpanded (mou → Mou)
+_STANDARD_TERMS = {term.lower(): term for term in ("Mou", "Arpu", "Vas", "Msisdn")}
+
+_SCHEMA_WORDS = {
+    word.lower(): word
+    for name in _STANDARD_NAMES
+    for word in re.findall(r'[A-Z][a-z0-9]*', name)
+}
+
+_VOCAB_TRIE = Trie()
+for _key, _word in {**_SCHEMA_WORDS, **_ABBREV, **_STANDARD_TERMS}.items():
+    _VOCAB_TRIE.insert(_key, _word)
+
+# Data/volume names need a unit inferred from the data profile, so the LLM keeps them
+_UNIT_DEPENDENT_TOKENS = frozenset({"Data", "Volume"})
+
+# Abbreviations whose expansion is already a complete column name under the prompt's
+# rules; generic ones (ind → Flag, cnt → Count) need context the LLM has to supply
+_STANDALONE_ABBREVS = frozenset({"aon", "imsi", "dob"})
+
+def tokenize_snake(col: str) -> list:
+    """
+    Segment a cleaned column name into (token, matched) pairs. Each '_' part is
+    consumed by longest-prefix trie matches; a part that does not segment fully
+    is kept as one raw, unmatched token for the LLM.
+    """
+    tokens = []
+    for part in col.split('_'):
+        if not part:
+            continue
+        i, words = 0, []
+        while i < len(part):
+            i, word = _VOCAB_TRIE.longest_prefix(part, i)
+            if word is None:
+                break
+            words.append(word)
+        if word is not None:
+            tokens.extend((w, True) for w in words)
+        else:
+            tokens.append((part, False))
+    return tokens
+
+def local_prepass(columns: list) -> dict:
+    resolved, used = {}, set()
+    for col in columns:
+        key    = _strip_sql_alias(col)
+        tokens = tokenize_snake(key)
+        if not tokens or not all(matched for _, matched in tokens):
+            continue
+        if any(token in _UNIT_DEPENDENT_TOKENS for token, _ in tokens):
+            continue
+        name = "".join(token for token, _ in tokens)
+        # Anything short of a canonical name still needs the prompt's naming and unit rules
+        if name not in _STANDARD_NAMES and key not in _STANDALONE_ABBREVS:
+            continue
+        if name not in used:
+            resolved[col] = name
+            used.add(name)
+    return resolved
+
+def _flag_duplicate_targets(column_map: dict) -> list:
+    """
+    Send columns that share a target name to ambiguous_ handling in place, since
+    df.rename would otherwise silently create duplicate columns. The generated
+    ambiguous_ names are kept unique against every other target. Returns their
+    ambiguous_fields entries.
+    """
+    by_name = {}
+    for col, name in column_map.items():
+        by_name.setdefault(name, []).append(col)
+
+    clashing = {name: cols for name, cols in by_name.items() if len(cols) > 1}
+    taken    = {name for name, cols in by_name.items() if len(cols) == 1}
+
+    clashes = []
+    for name, cols in clashing.items():
+        for col in cols:
+            base = new_name = f"ambiguous_{_strip_sql_alias(col)}"
+            suffix = 2
+            while new_name in taken:
+                new_name = f"{base}_{suffix}"
+                suffix += 1
+            taken.add(new_name)
+            column_map[col] = new_name
+            clashes.append({
+                "original_column": col,
+                "candidates"     : [name],
+                "reason"         : f"{name} was proposed for {len(cols)} columns: {cols}",
+                "sample_values"  : "",
+            })
+    return clashes
+
+def _render_rename_code(column_map: dict) -> str:
+    return f"rename_map = {column_map!r}\ndf = df.rename(columns=rename_map)"
+
+# ─────────────────────────────────────────────
+#  LLM CLIENT: Reused across runs to keep the HTTP pool warm
+# ─────────────────────────────────────────────
+
+_MODEL = "llama-3.3-70b-versatile"
+
+def _new_llm(model=_MODEL, temperature=0, max_tokens=8000):
+    return ChatGroq(
+        model=model,
+        temperature=temperature,
+        api_key=os.getenv("GROQ_API_KEY"),
+        max_tokens=max_tokens
+    )
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(model=_MODEL, temperature=0, max_tokens=8000):
+    return _new_llm(model, temperature, max_tokens)
+
+# A forced tool call ends the completion at the closing brace of its arguments,
+# so there is no trailing commentary to stream past or cut off
+def _structured(llm):
+    return llm.with_structured_output(FieldStandardizationOutput, method="function_calling")
+
+@functools.lru_cache(maxsize=1)
+def _get_structured_llm():
+    return _structured(_get_llm())
+
+# The async HTTP client is bound to the event loop it first ran on, so every
+# asyncio.run() (e.g. each run_batch call) gets its own client
+_ASYNC_LLMS = weakref.WeakKeyDictionary()
+
+def _get_async_structured_llm():
+    loop = asyncio.get_running_loop()
+    if loop not in _ASYNC_LLMS:
+        _ASYNC_LLMS[loop] = _structured(_new_llm())
+    return _ASYNC_LLMS[loop]
+
+# ─────────────────────────────────────────────
+#  RESPONSE CACHE: Identical prompts reuse the stored LLM output
+# ─────────────────────────────────────────────
+
+# Set AGENT_CACHE_PATH to an empty string to turn caching off
+_CACHE_PATH  = os.getenv("AGENT_CACHE_PATH", ".agent_cache.sqlite")
+_CACHE_READY = set()
+
+def _cache_key(prompt: str, model: str = _MODEL) -> str:
+    return hashlib.blake2b(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+def _cache_conn():
+    conn = sqlite3.connect(_CACHE_PATH)
+    if _CACHE_PATH not in _CACHE_READY:
+        conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT)")
+        conn.commit()
+        _CACHE_READY.add(_CACHE_PATH)
+    return contextlib.closing(conn)
+
+def _cache_get(key: str):
+    if not _CACHE_PATH:
+        return None
+    try:
+        with _cache_conn() as conn:
+            row = conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        logger.warning("[Agent 1] Response cache unavailable: %s", e)
+        return None
+
+def _cache_put(key: str, content: str) -> None:
+    if not _CACHE_PATH:
+        return
+    try:
+        with _cache_conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?)", (key, content))
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning("[Agent 1] Could not write response cache: %s", e)
+
+def _load_cached(key: str):
+    content = _cache_get(key)
+    if content is None:
+        return None
+    try:
+        return FieldStandardizationOutput.model_validate_json(content)
+    except ValidationError:
+        return None
+
+# ─────────────────────────────────────────────
+#  AGENT
+# ─────────────────────────────────────────────
+
+def _build_prompt(state: AgentState) -> tuple:
+    logger.info("=" * 60)
+    logger.info("[Agent 1] Field Standardization — Starting")
+    logger.info("=" * 60)
+
+    raw_columns  = state.df_columns
+    # Domain overrides can change any name, so with special rules every column goes to the LLM
+    resolved     = {} if state.special_rules else local_prepass(raw_columns)
+
+    if raw_columns:
+        logger.info("[Agent 1] Pre-processed %d columns. SQL aliases stripped.", len(raw_columns))
+    if resolved:
+        logger.info("[Agent 1] %d known abbreviation(s) mapped locally.", len(resolved))
+    if raw_columns and len(resolved) == len(raw_columns):
+        return None, resolved
+
+    cleaned_cols   = preprocess_column_names([c for c in raw_columns if c not in resolved])
+    already_mapped = f"ALREADY MAPPED (do not reuse these names): {sorted(resolved.values())}\n" if resolved else ""
+
+    prompt = f"""You are a Telecom Data Engineering Agent. Rename DataFrame columns to a clean, standardized format.
+
+## INPUTS
+SQL QUERY: {state.sql_query or 'Not provided'}
+COLUMNS (aliases stripped): {cleaned_cols if cleaned_cols else 'see dataset profile'}
+{already_mapped}DATASET PROFILE: {state.metadata_summary or 'Not provided'}
+SPECIAL RULES: {state.special_rules or 'None'}
+
+""" + _PROMPT_BODY
+    return prompt, resolved
+
+def _synthesize_output(resolved: dict) -> dict:
+    rename_code = _render_rename_code(resolved)
+    logger.info("[Agent 1] ✅ All %d fields mapped locally — LLM skipped.", len(resolved))
+    logger.info("[Agent 1] Rename code ready (%d chars).", len(rename_code))
+
+    return {
+        "cleaning_code"   : rename_code,
+        "ambiguous_fields": [],
+        "column_map"      : resolved,
+    }
+
+def _finalize_output(result: FieldStandardizationOutput, resolved: dict) -> dict:
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Agent 1] LLM RESPONSE:\n%s", result.model_dump_json(indent=2))
+
+    # ── Fold locally pre-mapped columns in and render the rename code ──
+    column_map       = {**result.rename_map, **resolved}
+    ambiguous_fields = [field.model_dump() for field in result.ambiguous_fields]
+    ambiguous_fields += _flag_duplicate_targets(column_map)
+    rename_code      = _render_rename_code(column_map)
 
     # ── Surface ambiguous/unknown fields ──
     if ambiguous_fields:
-        print(f"\n[Agent 1] ⚠️  {len(ambiguous_fields)} AMBIGUOUS FIELD(S) — Human review needed:\n")
+        logger.warning("[Agent 1] ⚠️  %d AMBIGUOUS FIELD(S) — Human review needed:", len(ambiguous_fields))
         for field in ambiguous_fields:
-            print(f"  Column     : {field.get('original_column')}")
-            print(f"  Candidates : {field.get('candidates')}")
-            print(f"  Reason     : {field.get('reason')}")
-            print(f"  Samples    : {field.get('sample_values')}\n")
+            logger.warning(
+                "  Column     : %s\n  Candidates : %s\n  Reason     : %s\n  Samples    : %s",
+                field.get('original_column'), field.get('candidates'),
+                field.get('reason'), field.get('sample_values'),
+            )
+
+    # ── One pass: collect unknowns and count confident mappings ──
+    unknown_fields, confident_count = [], 0
+    for k, v in column_map.items():
+        if not v.startswith(("ambiguous_", "unknown_")):
+            confident_count += 1
+        elif v.startswith("unknown_"):
+            unknown_fields.append(k)
 
-    unknown_fields = [k for k, v in column_map.items() if v.startswith("unknown_")]
     if unknown_fields:
-        print(f"[Agent 1] ❓ {len(unknown_fields)} UNKNOWN FIELD(S) — Manual mapping required:")
+        logger.warning("[Agent 1] ❓ %d UNKNOWN FIELD(S) — Manual mapping required:", len(unknown_fields))
         for f in unknown_fields:
-            print(f"  - {f}")
+            logger.warning("  - %s", f)
+
+    logger.info("[Agent 1] ✅ %d fields mapped confidently.", confident_count)
 
-    confident_count = len([v for v in column_map.values() if not (v.startswith("ambiguous_") or v.startswith("unknown_"))])
-    print(f"\n[Agent 1] ✅ {confident_count} fields mapped confidently.")
-    print(f"[Agent 1] Rename code ready ({len(rename_code)} chars).\n")
+    unknown_targets = [
+        v for k, v in column_map.items()
+        if k not in resolved and not v.startswith(("ambiguous_", "unknown_")) and v not in _STANDARD_NAMES
+    ]
+    if unknown_targets:
+        logger.info("[Agent 1] %d name(s) outside the standard schema: %s", len(unknown_targets), unknown_targets)
+    logger.info("[Agent 1] Rename code ready (%d chars).", len(rename_code))
 
     return {
         "cleaning_code"   : rename_code,
         "ambiguous_fields": ambiguous_fields,
         "column_map"      : column_map,
-    }
\ No newline at end of file
+    }
+
+def _no_output(error) -> dict:
+    logger.error("[Agent 1] LLM returned no parseable output: %s", error)
+    return {"cleaning_code": "", "ambiguous_fields": [], "column_map": {}}
+
+def _lookup(prompt: str) -> tuple:
+    key    = _cache_key(prompt)
+    result = _load_cached(key)
+    if result is None:
+        logger.info("[Agent 1] Sending to LLM...")
+    else:
+        logger.info("[Agent 1] Reusing cached LLM response.")
+    return key, result
+
+def _finish(result, resolved: dict, key: str) -> dict:
+    if result is None:
+        return _no_output("no structured output")
+    _cache_put(key, result.model_dump_json())
+    return _finalize_output(result, resolved)
+
+def field_standardization_agent(state: AgentState) -> dict:
+    prompt, resolved = _build_prompt(state)
+    if prompt is None:
+        return _synthesize_output(resolved)
+
+    key, result = _lookup(prompt)
+    if result is not None:
+        return _finalize_output(result, resolved)
+    try:
+        result = _get_structured_llm().invoke(prompt)
+    except (OutputParserException, ValidationError) as e:
+        return _no_output(e)
+    return _finish(result, resolved, key)
+
+async def afield_standardization_agent(state: AgentState) -> dict:
+    prompt, resolved = _build_prompt(state)
+    if prompt is None:
+        return _synthesize_output(resolved)
+
+    key, result = _lookup(prompt)
+    if result is not None:
+        return _finalize_output(result, resolved)
+    try:
+        result = await _get_async_structured_llm().ainvoke(prompt)
+    except (OutputParserException, ValidationError) as e:
+        return _no_output(e)
+    return _finish(result, resolved, key)
@@ -1,24 +1,48 @@
 # graph.py
+import asyncio
+import functools
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from source_code.state import AgentState
-from source_code.agents.agents import field_standardization_agent
+from source_code.agents.agents import field_standardization_agent, afield_standardization_agent
 from source_code.tools import code_executor_agent
 
-# 1. Initialize the graph with our schema
-workflow = StateGraph(AgentState)
+# Built on first use so importing this module stays cheap
+@functools.cache
+def get_ds_machine():
+    # 1. Initialize the graph with our schema
+    workflow = StateGraph(AgentState)
 
-# 2. Add our "Work Stations" (Nodes)
-workflow.add_node("cleaner", field_standardization_agent)
-workflow.add_node("executor", code_executor_agent)
+    # 2. Add our "Work Stations" (Nodes)
+    # The cleaner gets an async body so ainvoke() can await the LLM call while stream() stays sync
+    workflow.add_node("cleaner", RunnableLambda(field_standardization_agent, afunc=afield_standardization_agent))
+    workflow.add_node("executor", code_executor_agent)
 
-# 3. Define the Assembly Line (Edges)
-workflow.set_entry_point("cleaner")
+    # 3. Define the Assembly Line (Edges)
+    workflow.set_entry_point("cleaner")
 
-# Pass the state from the AI Brain directly to the Executor Hands
-workflow.add_edge("cleaner", "executor") 
+    # Pass the state from the AI Brain directly to the Executor Hands
+    workflow.add_edge("cleaner", "executor")
 
-# Once the Executor is done, finish the pipeline
-workflow.add_edge("executor", END)
+    # Once the Executor is done, finish the pipeline
+    workflow.add_edge("executor", END)
 
-# 4. Compile the machine
-ds_machine = workflow.compile()
\ No newline at end of file
+    # 4. Compile the machine
+    return workflow.compile()
+
+# 5. Run many datasets concurrently so their LLM calls overlap
+async def run_batch_async(states: list, max_concurrency: int = None) -> list:
+    ds_machine = get_ds_machine()
+    if not max_concurrency:
+        return await asyncio.gather(*(ds_machine.ainvoke(s) for s in states))
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(s):
+        async with semaphore:
+            return await ds_machine.ainvoke(s)
+
+    return await asyncio.gather(*(_run(s) for s in states))
+
+def run_batch(states: list, max_concurrency: int = None) -> list:
+    return asyncio.run(run_batch_async(states, max_concurrency))
@@ -1,10 +1,18 @@
-from typing import TypedDict, Optional
+from dataclasses import dataclass, field
+from typing import Optional
 
-# class passed between agents.    
-class AgentState(TypedDict):
-    file_path: str                      # Path to CSV
-    target_column: str                  # target column
-    metadata_summary: str               # Description of columns
-    cleaning_code: Optional[str]        # The Python code the Agent will generate
-    iteration_count: Optional[int]
-    error_log: Optional[str]            # To track self-correction loops
\ No newline at end of file
+# class passed between agents.
+@dataclass(slots=True)
+class AgentState:
+    file_path: str = ""                                         # Path to CSV
+    output_path: str = ""                                       # Where to save the result; defaults to <file>_standardized.csv
+    target_column: str = ""                                     # target column
+    df_columns: list[str] = field(default_factory=list)         # Raw column names, SQL aliases included
+    sql_query: str = ""                                         # Query that produced the dataset, for alias context
+    metadata_summary: str = ""                                  # Description of columns
+    special_rules: str = ""                                     # Domain overrides passed to the agent
+    cleaning_code: Optional[str] = None                         # The Python code the Agent will generate
+    ambiguous_fields: list[dict] = field(default_factory=list)  # Columns flagged for human review
+    column_map: dict[str, str] = field(default_factory=dict)    # Raw → standardized names, for audit
+    iteration_count: Optional[int] = None
+    error_log: Optional[str] = None                             # To track self-correction loops
\ No newline at end of file
@@ -1,4 +1,5 @@
 # tools.py
+import os
 import pandas as pd
 import traceback
 from source_code.state import AgentState
@@ -12,8 +13,8 @@ def code_executor_agent(state: AgentState) -> dict:
     print("[Executor] Running Generated Python Code")
     print("="*60)
 
-    file_path = state["file_path"]
-    cleaning_code = state.get("cleaning_code", "")
+    file_path = state.file_path
+    cleaning_code = state.cleaning_code or ""
 
     if not cleaning_code:
         print("[Executor] No code found to execute.")
@@ -35,14 +36,14 @@ def code_executor_agent(state: AgentState) -> dict:
         # 4. Extract the newly modified dataframe
         df_clean = local_vars["df"]
 
-        # 5. Save the result to prove it worked!
-        output_path = "standardized_output.csv"
+        # 5. Save the result next to its input so batch runs don't overwrite each other
+        output_path = state.output_path or os.path.splitext(file_path)[0] + "_standardized.csv"
         df_clean.to_csv(output_path, index=False)
         
         print(f"[Executor] ✅ Success! Clean dataset saved to: {output_path}")
         
         # Return a clear error log since it succeeded
-        return {"error_log": None}
+        return {"error_log": None, "output_path": output_path}
 
     except Exception as e:
         # If the AI wrote bad code, we catch the exact error message!
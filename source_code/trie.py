@@ -0,0 +1,29 @@
+# trie.py
+from typing import Optional
+
+class Trie:
+    """
+    Prefix tree over lowercase tokens. Lets the pre-pass segment a name like
+    'totrchgamt' into known tokens with one left-to-right scan.
+    """
+
+    def __init__(self):
+        self.children: dict = {}
+        self.value: Optional[str] = None
+
+    def insert(self, key: str, value: str) -> None:
+        node = self
+        for ch in key:
+            node = node.children.setdefault(ch, Trie())
+        node.value = value
+
+    def longest_prefix(self, s: str, start: int = 0) -> tuple:
+        """Return (end, value) of the longest key matching s[start:], or (start, None)."""
+        node, best = self, (start, None)
+        for i in range(start, len(s)):
+            node = node.children.get(s[i])
+            if node is None:
+                break
+            if node.value is not None:
+                best = (i + 1, node.value)
+        return best
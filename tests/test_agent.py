@@ -0,0 +1,181 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from langchain_core.exceptions import OutputParserException
+
+from source_code.agents import agents
+from source_code.agents.agents import FieldStandardizationOutput
+from source_code.graph import run_batch
+from source_code.state import AgentState
+
+COLUMNS = ["foo_x", "bar_y"]
+RESULT  = FieldStandardizationOutput(rename_map={"foo_x": "FooX", "bar_y": "BarY"})
+
+
+class StubLLM:
+    def __init__(self, result=RESULT, error=None):
+        self.result, self.error, self.calls = result, error, 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+
+def _sync(state):
+    return agents.field_standardization_agent(state)
+
+
+def _async(state):
+    return asyncio.run(agents.afield_standardization_agent(state))
+
+
+@pytest.fixture
+def use_llm(monkeypatch, tmp_path):
+    monkeypatch.setattr(agents, "_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+
+    def _use(llm):
+        monkeypatch.setattr(agents, "_get_structured_llm", lambda: llm)
+        monkeypatch.setattr(agents, "_get_async_structured_llm", lambda: llm)
+        return llm
+
+    return _use
+
+
+@pytest.mark.parametrize("run", [_sync, _async])
+def test_agent_success(use_llm, run):
+    llm = use_llm(StubLLM())
+    out = run(AgentState(df_columns=COLUMNS))
+
+    assert llm.calls == 1
+    assert out["column_map"] == {"foo_x": "FooX", "bar_y": "BarY"}
+    assert "df = df.rename(columns=rename_map)" in out["cleaning_code"]
+
+
+@pytest.mark.parametrize("run", [_sync, _async])
+def test_agent_parser_error_returns_empty_output_and_is_not_cached(use_llm, run):
+    use_llm(StubLLM(error=OutputParserException("bad tool call")))
+    out = run(AgentState(df_columns=COLUMNS))
+    assert out == {"cleaning_code": "", "ambiguous_fields": [], "column_map": {}}
+
+    llm = use_llm(StubLLM())
+    run(AgentState(df_columns=COLUMNS))
+    assert llm.calls == 1
+
+
+@pytest.mark.parametrize("run", [_sync, _async])
+def test_agent_cache_hit_skips_llm(use_llm, run):
+    use_llm(StubLLM())
+    run(AgentState(df_columns=COLUMNS))
+
+    llm = use_llm(StubLLM(error=RuntimeError("LLM must not be called")))
+    out = run(AgentState(df_columns=COLUMNS))
+
+    assert llm.calls == 0
+    assert out["column_map"] == {"foo_x": "FooX", "bar_y": "BarY"}
+
+
+def test_async_client_is_per_event_loop(monkeypatch):
+    class FakeChat:
+        def with_structured_output(self, *args, **kwargs):
+            return object()
+
+    monkeypatch.setattr(agents, "_new_llm", FakeChat)
+
+    async def _twice():
+        return agents._get_async_structured_llm(), agents._get_async_structured_llm()
+
+    first, again = asyncio.run(_twice())
+    second, _ = asyncio.run(_twice())
+    assert first is again
+    assert first is not second
+
+
+def test_run_batch_writes_one_output_per_input(use_llm, tmp_path):
+    use_llm(StubLLM())
+    states = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({"foo_x": [1], "bar_y": [2]}).to_csv(path, index=False)
+        states.append({"file_path": str(path), "df_columns": COLUMNS})
+
+    results = run_batch(states, max_concurrency=2)
+
+    assert [r["error_log"] for r in results] == [None, None]
+    for name in ("a", "b"):
+        out = pd.read_csv(tmp_path / f"{name}_standardized.csv")
+        assert list(out.columns) == ["FooX", "BarY"]
+
+
+def _finalize(rename_map, resolved=None):
+    return agents._finalize_output(FieldStandardizationOutput(rename_map=rename_map), resolved or {})
+
+
+def test_duplicate_targets_from_llm_become_ambiguous():
+    out = _finalize({"a": "Foo", "b": "Foo", "c": "Bar"})
+
+    assert out["column_map"] == {"a": "ambiguous_a", "b": "ambiguous_b", "c": "Bar"}
+    assert [f["original_column"] for f in out["ambiguous_fields"]] == ["a", "b"]
+    assert all(f["candidates"] == ["Foo"] for f in out["ambiguous_fields"])
+
+
+def test_llm_name_clashing_with_local_name_becomes_ambiguous():
+    out = _finalize({"cust_no": "CustomerId"}, resolved={"customer_id": "CustomerId"})
+
+    assert out["column_map"] == {"cust_no": "ambiguous_cust_no", "customer_id": "ambiguous_customer_id"}
+
+
+def test_generated_ambiguous_names_stay_unique():
+    out = _finalize({"a": "Foo", "t.a": "Foo", "c": "ambiguous_a"})
+
+    names = list(out["column_map"].values())
+    assert len(names) == len(set(names))
+    assert out["column_map"]["c"] == "ambiguous_a"
+    assert out["column_map"]["a"] == "ambiguous_a_2"
+    assert out["column_map"]["t.a"] == "ambiguous_a_3"
+
+
+@pytest.mark.parametrize("sample_values, expected", [
+    (20250516, "20250516"),
+    ({"min": 1, "max": 9}, "{'min': 1, 'max': 9}"),
+    ([1, 2], "[1, 2]"),
+    (None, ""),
+])
+def test_ambiguous_field_coerces_sample_values(sample_values, expected):
+    result = FieldStandardizationOutput.model_validate({
+        "rename_map": {"dt_1": "ambiguous_dt_1"},
+        "ambiguous_fields": [{
+            "original_column": "dt_1",
+            "candidates": ["ActivationDate", "BirthDate"],
+            "reason": "two date columns",
+            "sample_values": sample_values,
+        }],
+    })
+    assert result.ambiguous_fields[0].sample_values == expected
+
+
+def test_ambiguous_field_coerces_candidates_and_reason():
+    result = FieldStandardizationOutput.model_validate({
+        "rename_map": {},
+        "ambiguous_fields": [
+            {"original_column": "x", "candidates": "OnlyOption", "reason": 3},
+            {"original_column": "y", "candidates": None, "reason": None},
+        ],
+    })
+    assert result.ambiguous_fields[0].candidates == ["OnlyOption"]
+    assert result.ambiguous_fields[0].reason == "3"
+    assert result.ambiguous_fields[1].candidates == []
+    assert result.ambiguous_fields[1].reason == ""
+
+
+def test_off_schema_log_skips_locally_resolved_names(caplog):
+    with caplog.at_level("INFO", logger=agents.__name__):
+        _finalize({"foo_x": "FooX"}, resolved={"aon": "AgeOnNetwork"})
+
+    off_schema = [r.getMessage() for r in caplog.records if "outside the standard schema" in r.getMessage()]
+    assert off_schema == ["[Agent 1] 1 name(s) outside the standard schema: ['FooX']"]
@@ -0,0 +1,52 @@
+import warnings
+
+import pytest
+
+from source_code.agents import agents
+from source_code.agents.agents import FieldStandardizationOutput
+
+
+@pytest.fixture
+def cache_path(monkeypatch, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    monkeypatch.setattr(agents, "_CACHE_PATH", path)
+    return path
+
+
+def test_round_trip(cache_path):
+    key = agents._cache_key("prompt")
+    assert agents._cache_get(key) is None
+
+    agents._cache_put(key, "stored")
+    assert agents._cache_get(key) == "stored"
+
+    agents._cache_put(key, "replaced")
+    assert agents._cache_get(key) == "replaced"
+
+
+def test_load_cached_validates_entry(cache_path):
+    result = FieldStandardizationOutput(rename_map={"a": "B"})
+    agents._cache_put("good", result.model_dump_json())
+    assert agents._load_cached("good") == result
+
+
+@pytest.mark.parametrize("content", ["not json", '{"renamed": {"a": "B"}}'])
+def test_load_cached_ignores_invalid_or_stale_entry(cache_path, content):
+    agents._cache_put("bad", content)
+    assert agents._load_cached("bad") is None
+
+
+def test_connections_are_closed(cache_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        agents._cache_put("k", "v")
+        assert agents._cache_get("k") == "v"
+
+
+def test_empty_path_disables_cache(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(agents, "_CACHE_PATH", "")
+
+    agents._cache_put("k", "v")
+    assert agents._cache_get("k") is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,57 @@
+from source_code.agents.agents import STANDARD_CHURN_SCHEMA, _STANDARD_NAMES, local_prepass, tokenize_snake
+
+
+def test_tokenize_full_segmentation():
+    assert tokenize_snake("tot_rchg_amt_l30d") == [
+        ("Total", True), ("Recharge", True), ("Amount", True), ("Last30d", True),
+    ]
+
+
+def test_tokenize_concatenated_tokens_in_one_part():
+    assert tokenize_snake("totrchg") == [("Total", True), ("Recharge", True)]
+
+
+def test_tokenize_partial_segmentation_keeps_raw_part():
+    # 'inc' is a prefix of 'income' but the rest does not segment
+    assert tokenize_snake("income_amt") == [("income", False), ("Amount", True)]
+
+
+def test_tokenize_skips_empty_parts():
+    assert tokenize_snake("_cust__id_") == [("Customer", True), ("Id", True)]
+    assert tokenize_snake("") == []
+
+
+def test_prepass_maps_standard_names_and_standalone_abbrevs():
+    assert local_prepass(["rchg_amt_l30d", "t1.customer_id", "aon"]) == {
+        "rchg_amt_l30d" : "RechargeAmountLast30d",
+        "t1.customer_id": "CustomerId",
+        "aon"           : "AgeOnNetwork",
+    }
+
+
+def test_prepass_leaves_non_canonical_names_to_llm():
+    cols = ["churn", "age", "offnet_mou", "mou", "days", "last", "date", "ind", "tot_rchg_amt_l30d"]
+    assert local_prepass(cols) == {}
+
+
+def test_prepass_skips_partially_segmented_columns():
+    assert local_prepass(["income_amt"]) == {}
+
+
+def test_prepass_keeps_first_of_duplicate_targets():
+    assert local_prepass(["customer_id", "cust_id"]) == {"customer_id": "CustomerId"}
+
+
+def test_prepass_excludes_data_and_volume_columns():
+    assert local_prepass(["data_usage_l30d_kb", "data_rchg_cnt_l30d", "gprs", "vol"]) == {}
+
+
+def test_standard_names_are_pinned():
+    assert len(_STANDARD_NAMES) == 43
+    assert {"CustomerId", "ChurnFlag", "RechargeAmountLast30d", "MouIntlLast30dMins"} <= _STANDARD_NAMES
+    assert not {"Use", "Kb", "Standard", "Churn"} & _STANDARD_NAMES
+
+
+def test_schema_prompt_lists_every_standard_name():
+    for name in _STANDARD_NAMES:
+        assert name in STANDARD_CHURN_SCHEMA
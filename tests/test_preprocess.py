@@ -0,0 +1,20 @@
+import pytest
+
+from source_code.agents.agents import _strip_sql_alias, preprocess_column_names
+
+
+@pytest.mark.parametrize("raw, cleaned", [
+    ("t1.col", "col"),
+    ("schema.tbl.col", "col"),
+    ("a.CustId", "custid"),
+    ("rev_1.5", "rev_1.5"),
+    ("col.1", "col.1"),
+    ("  Col  ", "col"),
+    ("plain_name", "plain_name"),
+])
+def test_strip_sql_alias(raw, cleaned):
+    assert _strip_sql_alias(raw) == cleaned
+
+
+def test_preprocess_column_names_keeps_order():
+    assert preprocess_column_names(["t.B", "a", "rev_1.5"]) == ["b", "a", "rev_1.5"]
@@ -0,0 +1,34 @@
+from source_code.trie import Trie
+
+
+def _trie(**entries):
+    trie = Trie()
+    for key, value in entries.items():
+        trie.insert(key, value)
+    return trie
+
+
+def test_longest_prefix_prefers_longest_key():
+    trie = _trie(inc="Incoming", incmg="Incoming2")
+    assert trie.longest_prefix("incmgx") == (5, "Incoming2")
+
+
+def test_longest_prefix_falls_back_to_shorter_key():
+    trie = _trie(inc="Incoming", incmg="Incoming2")
+    assert trie.longest_prefix("incom") == (3, "Incoming")
+
+
+def test_longest_prefix_from_offset():
+    trie = _trie(tot="Total", rchg="Recharge")
+    assert trie.longest_prefix("totrchg", 3) == (7, "Recharge")
+
+
+def test_longest_prefix_no_match_returns_start():
+    trie = _trie(tot="Total")
+    assert trie.longest_prefix("income", 2) == (2, None)
+    assert trie.longest_prefix("", 0) == (0, None)
+
+
+def test_inner_node_without_value_is_not_a_match():
+    trie = _trie(rchg="Recharge")
+    assert trie.longest_prefix("rch") == (0, None)